@@ -0,0 +1,551 @@
+"""
+Purpose:
+
+- Filesystem and docstring helpers shared by the skill scripts (codebase_snapshot.py,
+  docs_pack.py).
+
+Key responsibilities:
+
+- One-pass repository walk: tree view plus the .py/.md files to report on.
+- Exclude handling: directory names as a set, Path.match-style globs (files only) as one
+  compiled pattern.
+- Module docstring extraction without executing or fully parsing the code.
+
+Public API:
+
+- is_within_str, SkipRules, compile_skip_rules, walk_all, build_tree_lines,
+  extract_module_docstring, extract_module_docstring_fallback, truncate_block, text_block,
+  strip_final_newline, default_jobs
+
+Dependencies:
+
+- Standard library only. Scripts import this as `_shared.fsutils` after putting the
+  skills directory on sys.path.
+
+Notes:
+
+- Symlinked directories are listed in the tree but never followed.
+- Excluded directories are pruned before descending, so vendored trees cost one entry.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path, PurePath
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple
+
+# ast/tokenize/io/codecs are imported inside the functions that need them: runs that
+# find no .py files never pay for them.
+if TYPE_CHECKING:
+    import ast
+
+
+def is_within_str(child: str, parent: str) -> bool:
+    """
+    True if `child` is `parent` or inside it. Both must already be resolved: this is a
+    string prefix test with no filesystem calls.
+    """
+    # join(parent, "") adds the separator unless parent already ends with one (e.g. "/").
+    return child == parent or child.startswith(os.path.join(parent, ""))
+
+
+def _glob_class_to_regex(stuff: str) -> str:
+    # fnmatch.translate's bracket handling (empty ranges dropped, set operators escaped).
+    # The (?!/) guard keeps negated classes and ranges like [+-0] off the separator.
+    if "-" not in stuff:
+        stuff = stuff.replace("\\", r"\\")
+    else:
+        chunks: list[str] = []
+        i, j = 0, len(stuff)
+        k = 2 if stuff[0] == "!" else 1
+        while True:
+            k = stuff.find("-", k, j)
+            if k < 0:
+                break
+            chunks.append(stuff[i:k])
+            i = k + 1
+            k = k + 3
+        chunk = stuff[i:j]
+        if chunk:
+            chunks.append(chunk)
+        else:
+            chunks[-1] += "-"
+        for k in range(len(chunks) - 1, 0, -1):
+            if chunks[k - 1][-1] > chunks[k][0]:
+                chunks[k - 1] = chunks[k - 1][:-1] + chunks[k][1:]
+                del chunks[k]
+        stuff = "-".join(c.replace("\\", r"\\").replace("-", r"\-") for c in chunks)
+    stuff = re.sub(r"([&~|])", r"\\\1", stuff)
+    if not stuff:
+        return "(?!)"
+    if stuff == "!":
+        return "[^/]"
+    if stuff[0] == "!":
+        stuff = "^" + stuff[1:]
+    elif stuff[0] in ("^", "["):
+        stuff = "\\" + stuff
+    return f"(?!/)[{stuff}]"
+
+
+def _glob_component_to_regex(part: str) -> str:
+    # fnmatch.translate for one path component, except that nothing matches "/": a pattern
+    # part can never span two path components.
+    out: list[str] = []
+    i, n = 0, len(part)
+    while i < n:
+        c = part[i]
+        i += 1
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i
+            if j < n and part[j] == "!":
+                j += 1
+            if j < n and part[j] == "]":
+                j += 1
+            while j < n and part[j] != "]":
+                j += 1
+            if j >= n:
+                out.append("\\[")
+                continue
+            out.append(_glob_class_to_regex(part[i:j]))
+            i = j + 1
+        else:
+            out.append(re.escape(c))
+    return "".join(out)
+
+
+def _glob_to_regex(glob: str) -> str | None:
+    """
+    Translate `glob` to a regex over "/"-separated relative paths with Path.match semantics.
+
+    Pattern parts match path components from the right ("**" behaves like "*"). Returns
+    None for patterns Path.match can never satisfy on a relative path (absolute or empty).
+    """
+    # PurePath splits the pattern exactly as Path.match does ("//" and "." collapse).
+    pattern = PurePath(glob)
+    if pattern.drive or pattern.root or not pattern.parts:
+        return None
+    return "(?:.*/)?" + "/".join(_glob_component_to_regex(p) for p in pattern.parts)
+
+
+class SkipRules(NamedTuple):
+    # Entry names excluded anywhere in the tree (files named like this included).
+    dir_names: frozenset[str]
+    # Exclude globs as one pattern over "/"-separated relative paths; None if there are none.
+    file_re: re.Pattern[str] | None
+
+
+def compile_skip_rules(exclude_dirs: Iterable[str], exclude_globs: Iterable[str]) -> SkipRules:
+    """
+    Build the exclude rules: directory names as a set, globs compiled into one pattern.
+
+    Globs only ever exclude files; directories are pruned by name alone.
+    """
+    alternatives = [r for r in map(_glob_to_regex, exclude_globs) if r is not None]
+    file_re = None
+    if alternatives:
+        # Path.match case-folds on Windows.
+        flags = re.DOTALL | (re.IGNORECASE if os.name == "nt" else 0)
+        file_re = re.compile("|".join(f"(?:{a})" for a in alternatives), flags)
+    return SkipRules(frozenset(exclude_dirs), file_re)
+
+
+def _should_skip(name: str, rel_path: str, is_dir: bool, skip: SkipRules) -> bool:
+    # Ancestors were already checked before descending, so the entry's own name suffices.
+    if name in skip.dir_names:
+        return True
+    if is_dir or skip.file_re is None:
+        return False
+    return skip.file_re.fullmatch(rel_path.replace(os.sep, "/")) is not None
+
+
+def _entry_is_dir(e: os.DirEntry[str]) -> bool:
+    # DirEntry.is_dir()/is_file() follow symlinks and raise on ELOOP or ENOTDIR (a link
+    # to itself, or through a regular file); Path.is_dir()/is_file() returned False.
+    try:
+        return e.is_dir()
+    except OSError:
+        return False
+
+
+def _entry_is_file(e: os.DirEntry[str]) -> bool:
+    try:
+        return e.is_file()
+    except OSError:
+        return False
+
+
+def walk_all(
+    root: Path,
+    max_depth: int,
+    skip: SkipRules,
+    focus: Path | None = None,
+    collect_md: bool = False,
+) -> tuple[list[str], list[tuple[str, str]], list[tuple[str, str]]]:
+    """
+    Walk the repository once, returning (tree_lines, py_files, md_files).
+
+    Files are (absolute path, path relative to root) string pairs, so callers can open and
+    label them without building Path objects.
+
+    Tree lines cover `root` down to `max_depth`. .py files are collected from `focus`
+    (when given) and, with `collect_md`, .md files from the whole root, both at any depth.
+    Excluded directories are pruned before descending and symlinked directories are
+    listed but not followed. `root` and `focus` must already be resolved.
+    """
+    root_str = str(root)
+    # Entry paths all start with root_str + sep, so relative paths are plain slices.
+    rel_start = len(os.path.join(root_str, ""))
+    focus_str = str(focus) if focus is not None else None
+
+    lines: list[str] = [root_str]
+    py_files: list[tuple[str, str]] = []
+    md_files: list[tuple[str, str]] = []
+
+    # One "│   "/"    " segment per open ancestor; joined once per rendered directory
+    # rather than re-concatenated on every descent (and not at all past the tree depth).
+    prefix_parts: list[str] = []
+
+    def walk(dir_path: str, depth: int, in_focus: bool) -> None:
+        in_tree = depth < max_depth
+        prefix = "".join(prefix_parts) if in_tree else ""
+
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except PermissionError:
+            if in_tree:
+                lines.append(prefix + "└── " + "[permission denied]")
+            return
+        except OSError:
+            return
+
+        kept: list[tuple[bool, os.DirEntry[str]]] = []
+        for e in entries:
+            # Follows symlinks, so a linked directory is listed (and excluded) as a directory;
+            # it is only never descended into.
+            is_dir = _entry_is_dir(e)
+            # Below the tree depth only directories and candidate files matter; reject
+            # everything else by name before any path slicing or regex work.
+            if not (
+                in_tree
+                or is_dir
+                or (in_focus and e.name.endswith(".py"))
+                or (collect_md and e.name.endswith(".md"))
+            ):
+                continue
+            if _should_skip(e.name, e.path[rel_start:], is_dir, skip):
+                continue
+            kept.append((is_dir, e))
+
+        if in_tree:
+            # Sort: dirs first, then files; alpha insensitive. Keyed on is_file() like the
+            # original Path-based walk, so broken symlinks also sort ahead of files.
+            kept.sort(key=lambda t: (_entry_is_file(t[1]), t[1].name.lower()))
+
+        last = len(kept) - 1
+        for i, (is_dir, e) in enumerate(kept):
+            if in_tree:
+                connector = "└── " if i == last else "├── "
+                lines.append(prefix + connector + e.name + ("/" if is_dir else ""))
+
+            if is_dir:
+                if e.is_symlink():
+                    continue
+                child_in_focus = in_focus or e.path == focus_str
+                # Past the tree depth, .py collection only needs directories inside focus
+                # (or leading to it); .md collection needs everything.
+                leads_to_focus = focus_str is not None and focus_str.startswith(e.path + os.sep)
+                if in_tree or collect_md or child_in_focus or leads_to_focus:
+                    prefix_parts.append("    " if i == last else "│   ")
+                    walk(e.path, depth + 1, child_in_focus)
+                    prefix_parts.pop()
+            elif collect_md and e.name.endswith(".md"):
+                if _entry_is_file(e):
+                    md_files.append((e.path, e.path[rel_start:]))
+            elif in_focus and e.name.endswith(".py") and _entry_is_file(e):
+                py_files.append((e.path, e.path[rel_start:]))
+
+    walk(root_str, 0, focus_str == root_str)
+    py_files.sort(key=lambda f: f[0].lower())
+    md_files.sort(key=lambda f: f[0].lower())
+    return lines, py_files, md_files
+
+
+def build_tree_lines(
+    root: Path,
+    max_depth: int,
+    skip: SkipRules,
+) -> list[str]:
+    """
+    Render a deterministic tree view.
+    """
+    return walk_all(root, max_depth, skip)[0]
+
+
+def _read_python_source(path: str | os.PathLike[str]) -> str:
+    import tokenize
+
+    # tokenize.open respects PEP 263 encoding cookies.
+    try:
+        with tokenize.open(path) as f:
+            return f.read()
+    except Exception:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read()
+
+
+_DOCSTRING_PREFIX_BYTES = 8192
+
+_DOCSTRING_START_RE = re.compile(r"([A-Za-z]{0,2})(\"\"\"|'''|\"|')")
+
+# Full string literals, honouring backslash escapes; single-quoted ones may not span lines.
+_STRING_LITERAL_RES = {
+    '"""': re.compile(r'"""(?:[^"\\]|\\.|"(?!""))*"""', re.DOTALL),
+    "'''": re.compile(r"'''(?:[^'\\]|\\.|'(?!''))*'''", re.DOTALL),
+    '"': re.compile(r'"(?:[^"\\\n]|\\.)*"', re.DOTALL),
+    "'": re.compile(r"'(?:[^'\\\n]|\\.)*'", re.DOTALL),
+}
+
+
+def _docstring_from_prefix(data: bytes, complete: bool) -> tuple[bool, str | None]:
+    """
+    Find the module docstring by scanning raw leading bytes, without building an AST.
+
+    Returns (decided, docstring). `decided` is False whenever the scan cannot be sure it
+    agrees with the parser (literal runs past the window, parenthesised or indented first
+    statement, implicit concatenation, b/f prefixes, ...); callers then use the full parse.
+    """
+    import ast
+    import codecs
+    import io
+    import tokenize
+
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        text = codecs.getincrementaldecoder(encoding)().decode(data, final=complete)
+    except (SyntaxError, LookupError, UnicodeDecodeError):
+        return False, None
+    # Same universal-newline translation tokenize.open applies.
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    pos = 0
+    while pos < len(text):
+        nl = text.find("\n", pos)
+        line = text[pos:] if nl == -1 else text[pos:nl]
+        stripped = line.lstrip(" \t\f")
+        if stripped and not stripped.startswith("#"):
+            break
+        if nl == -1:
+            return complete, None
+        pos = nl + 1
+    else:
+        return complete, None
+
+    if line[0] in " \t\f(\\":
+        return False, None
+
+    m = _DOCSTRING_START_RE.match(line)
+    if m is None:
+        # First statement starts with a name, keyword, decorator, number...: no docstring.
+        # Unless the window cut the line: "u" or "rb" may still turn into a string prefix.
+        return complete or nl != -1, None
+    if m.group(1).lower() not in ("", "r", "u"):
+        return False, None
+
+    literal = _STRING_LITERAL_RES[m.group(2)].match(text, pos + len(m.group(1)))
+    if literal is None:
+        return False, None
+
+    end = literal.end()
+    nl = text.find("\n", end)
+    if nl == -1 and not complete:
+        return False, None
+    rest = (text[end:] if nl == -1 else text[end:nl]).lstrip(" \t\f")
+    if rest and rest[0] not in "#;":
+        return False, None
+
+    try:
+        value = ast.literal_eval(text[pos:end])
+    except Exception:
+        return False, None
+    if not isinstance(value, str):
+        return False, None
+    value = value.strip("\n")
+    return True, (value if value.strip() else None)
+
+
+_AST_PREFIX_CHARS = 32768
+
+# Cutting just before a top-level def/class/decorator rarely lands inside a string or bracket.
+_TOP_LEVEL_DEF_RE = re.compile(r"\n(?=(?:def |class |async def |@))")
+
+
+def _parse_module_head(source: str) -> ast.Module:
+    """
+    Parse only as much source as needed to see the first statement.
+
+    Tries the first ~32 KB, cut before the last top-level def/class in it; only if that
+    prefix is not valid on its own is the whole source parsed. Raises like ast.parse.
+    """
+    import ast
+
+    if len(source) > _AST_PREFIX_CHARS:
+        cut = -1
+        for m in _TOP_LEVEL_DEF_RE.finditer(source, 0, _AST_PREFIX_CHARS):
+            cut = m.start()
+        if cut < 0:
+            cut = source.rfind("\n", 0, _AST_PREFIX_CHARS)
+        if cut > 0:
+            try:
+                return ast.parse(source[: cut + 1])
+            except SyntaxError:
+                pass
+    return ast.parse(source)
+
+
+def extract_module_docstring(path: str | os.PathLike[str]) -> str | None:
+    """
+    Extract module docstring.
+
+    A cheap scan of the first few KB handles the common case; otherwise parse with AST,
+    falling back to token scanning if syntax errors exist.
+    """
+    import ast
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read(_DOCSTRING_PREFIX_BYTES)
+            complete = len(data) < _DOCSTRING_PREFIX_BYTES
+            decided, doc = _docstring_from_prefix(data, complete)
+            if not decided and not complete:
+                # The docstring may simply be longer than the window.
+                decided, doc = _docstring_from_prefix(data + f.read(), True)
+        if decided:
+            return doc
+    except OSError:
+        pass
+
+    source = _read_python_source(path)
+
+    try:
+        module = _parse_module_head(source)
+        doc = ast.get_docstring(module, clean=False)
+        if doc is None:
+            return None
+        doc = doc.strip("\n")
+        return doc if doc.strip() else None
+    except SyntaxError:
+        return extract_module_docstring_fallback(source)
+    except Exception:
+        # If parsing explodes for a weird reason, attempt fallback anyway.
+        return extract_module_docstring_fallback(source)
+
+
+def extract_module_docstring_fallback(source: str) -> str | None:
+    """
+    Fallback: scan tokens and treat the first non-trivia STRING token as module docstring.
+    """
+    import ast
+    import io
+    import tokenize
+
+    try:
+        tokgen = tokenize.generate_tokens(io.StringIO(source).readline)
+    except Exception:
+        return None
+
+    for tok in tokgen:
+        if tok.type in (
+            tokenize.ENCODING,
+            tokenize.NL,
+            tokenize.NEWLINE,
+            tokenize.COMMENT,
+            tokenize.INDENT,
+            tokenize.DEDENT,
+        ):
+            continue
+
+        if tok.type == tokenize.STRING:
+            try:
+                value = ast.literal_eval(tok.string)
+                if isinstance(value, str):
+                    value = value.strip("\n")
+                    return value if value.strip() else None
+            except Exception:
+                # Worst case: return the raw token text.
+                raw = tok.string.strip("\n")
+                return raw if raw.strip() else None
+
+        # First real token is not a string => no module docstring
+        return None
+
+    return None
+
+
+# Line boundaries str.splitlines() honours besides "\n".
+_OTHER_LINE_BREAKS = "\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+def _has_other_line_breaks(text: str) -> bool:
+    # A few `in` scans are far cheaper than a character-class regex search.
+    for ch in _OTHER_LINE_BREAKS:
+        if ch in text:
+            return True
+    return False
+
+
+def truncate_block(text: str, max_lines: int, max_chars: int) -> str:
+    if not text or _has_other_line_breaks(text):
+        lines = text.splitlines()
+    else:
+        # "\n"-only text: splitlines() would just drop one trailing newline, so most
+        # docstrings already fit as-is and the rest only need their first max_lines split off.
+        if text.endswith("\n"):
+            text = text[:-1]
+        if len(text) <= max_chars and text.count("\n") < max_lines:
+            return text
+        lines = text.split("\n", max_lines)
+    if len(lines) > max_lines:
+        lines = lines[:max_lines] + ["… (truncated)"]
+    out = "\n".join(lines)
+    if len(out) > max_chars:
+        out = out[: max_chars - 20].rstrip() + "\n… (truncated)"
+    return out
+
+
+def text_block(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Render `lines` as a fenced ```text block, one newline-terminated chunk per line.
+    """
+    yield "```text\n"
+    for line in lines:
+        yield line + "\n"
+    yield "```\n\n"
+
+
+def strip_final_newline(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Pass `chunks` through, dropping the trailing newline of the last one.
+
+    Output sections are emitted newline-terminated; files keep the old "\n".join(parts)
+    shape, which has no separator after the final part.
+    """
+    pending: str | None = None
+    for chunk in chunks:
+        if pending is not None:
+            yield pending
+        pending = chunk
+    if pending is not None:
+        yield pending[:-1] if pending.endswith("\n") else pending
+
+
+def default_jobs() -> int:
+    """
+    Worker threads for per-file reads; these are I/O-bound, so oversubscribe the CPUs.
+    """
+    return min(32, (os.cpu_count() or 4) * 4)
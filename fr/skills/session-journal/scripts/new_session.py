@@ -10,26 +10,76 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
-import re
+import os
 from pathlib import Path
 
 
+class _SlugTable(dict):
+    # str.translate table: [a-z0-9] map to themselves, every other character to "-".
+    def __missing__(self, key: int) -> str:
+        return "-"
+
+
+_SLUG_TABLE = _SlugTable({ord(c): c for c in "abcdefghijklmnopqrstuvwxyz0123456789"})
+
+
 def slugify(text: str) -> str:
-    text = text.strip().lower()
-    text = re.sub(r"[^a-z0-9]+", "-", text)
-    text = re.sub(r"-{2,}", "-", text).strip("-")
+    text = text.strip().lower().translate(_SLUG_TABLE)
+    # Splitting on "-" and dropping empties collapses runs and trims the ends in one pass.
+    text = "-".join(part for part in text.split("-") if part)
     return text or "session"
 
 
+# Caches "<dir st_mtime_ns> <max index>" so unchanged session dirs are not rescanned.
+INDEX_CACHE_NAME = ".index"
+
+
+def _read_index_cache(sessions_dir: Path) -> int | None:
+    try:
+        cached_mtime, cached_max = (sessions_dir / INDEX_CACHE_NAME).read_text(encoding="utf-8").split()
+        if int(cached_mtime) == sessions_dir.stat().st_mtime_ns:
+            return int(cached_max)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _write_index_cache(sessions_dir: Path, max_idx: int) -> None:
+    """
+    Record max_idx against the directory's current mtime. Call after the directory changes.
+    """
+    cache = sessions_dir / INDEX_CACHE_NAME
+    try:
+        # Creating the cache file bumps the directory mtime, so it must exist before we
+        # read the mtime; rewriting an existing file does not.
+        cache.touch(exist_ok=True)
+        cache.write_text(f"{sessions_dir.stat().st_mtime_ns} {max_idx}\n", encoding="utf-8")
+    except OSError:
+        pass
+
+
 def next_index(sessions_dir: Path) -> int:
     """
     Finds the next numeric prefix like 0007-YYYY-MM-DD--title.md
+
+    Trusts the .index cache while the directory mtime is unchanged; otherwise rescans.
     """
+    cached_max = _read_index_cache(sessions_dir)
+    if cached_max is not None:
+        return cached_max + 1
+
     max_idx = 0
-    for p in sessions_dir.glob("*.md"):
-        m = re.match(r"^(\d{4})-", p.name)
-        if m:
-            max_idx = max(max_idx, int(m.group(1)))
+    with os.scandir(sessions_dir) as it:
+        for entry in it:
+            name = entry.name
+            # Fixed "NNNN-" prefix; isdecimal() accepts exactly what the old \d{4} did.
+            if name.endswith(".md") and name[4:5] == "-" and name[:4].isdecimal():
+                # --no-index sessions start with the date (YYYY-MM-DD--); the year is no index.
+                if name[7:8] == "-" and name[5:7].isdecimal() and name[8:10].isdecimal():
+                    continue
+                idx = int(name[:4])
+                if idx > max_idx:
+                    max_idx = idx
     return max_idx + 1
 
 
@@ -93,6 +143,8 @@ def main() -> None:
 """
 
     path.write_text(content, encoding="utf-8")
+    if idx is not None:
+        _write_index_cache(sessions_dir, idx)
     print(str(path))
 
 
@@ -0,0 +1,16 @@
+"""
+Purpose:
+
+- Make the skill helpers importable from tests as `_shared.fsutils`.
+
+Notes:
+
+- The skill scripts do the same sys.path insert when run directly.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "fr" / "skills"))
@@ -0,0 +1,51 @@
+"""
+Purpose:
+
+- Unit tests for docs_pack.py helpers.
+
+Notes:
+
+- The script lives in a hyphenated skill folder, so it is loaded by file path.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parents[1] / "fr" / "skills" / "update-documentation" / "scripts" / "docs_pack.py"
+
+_spec = importlib.util.spec_from_file_location("docs_pack", SCRIPT)
+assert _spec is not None and _spec.loader is not None
+docs_pack = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(docs_pack)
+
+
+def _reference_headings(text: str, max_headings: int) -> list[str]:
+    # The original implementation: read the whole file, then splitlines().
+    out: list[str] = []
+    for line in text.splitlines():
+        m = docs_pack._HEADING_RE.match(line)
+        if m:
+            out.append(("  " * (len(m.group(1)) - 1)) + f"- {m.group(2)}")
+            if len(out) >= max_headings:
+                break
+    return out
+
+
+def test_extract_headings_matches_whole_file_splitlines(tmp_path: Path) -> None:
+    text = (
+        "# Title\n## Sub\ntext\n### Third  \n####### no\n#nope\n"
+        "# A\r\n## B \r\n# C\r# D\x0c# E\x1c## F\x85# G\u2028# H\u2029### I\n"
+    )
+    path = tmp_path / "doc.md"
+    path.write_text(text, encoding="utf-8", newline="")
+    for max_headings in (1, 3, 25):
+        assert docs_pack.extract_headings(str(path), max_headings) == _reference_headings(
+            path.read_text(encoding="utf-8"), max_headings
+        )
+    assert docs_pack.extract_headings(str(path), 25)[-3:] == ["- G", "- H", "    - I"]
+
+
+def test_extract_headings_missing_file(tmp_path: Path) -> None:
+    assert docs_pack.extract_headings(str(tmp_path / "missing.md"), 5) == []
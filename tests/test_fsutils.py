@@ -0,0 +1,320 @@
+"""
+Purpose:
+
+- Unit tests for the shared skill helpers in _shared/fsutils.py.
+
+Notes:
+
+- Exclude globs are checked against PurePath.match, which the scripts originally called
+  per file; the compiled pattern must agree with it exactly.
+- The docstring prefix scan is checked against a full ast.parse of the same source.
+- truncate_block's fast path is checked against the original splitlines() version.
+"""
+
+from __future__ import annotations
+
+import ast
+import io
+import itertools
+import os
+import random
+import tokenize
+from pathlib import Path, PurePath
+
+import pytest
+
+from _shared.fsutils import (
+    _docstring_from_prefix,
+    _should_skip,
+    compile_skip_rules,
+    extract_module_docstring,
+    is_within_str,
+    truncate_block,
+    walk_all,
+)
+
+
+def _glob_excludes(glob: str, rel: str, is_dir: bool = False) -> bool:
+    name = rel.rsplit("/", 1)[-1]
+    return _should_skip(name, rel.replace("/", os.sep), is_dir, compile_skip_rules((), [glob]))
+
+
+def _path_match(glob: str, rel: str) -> bool:
+    return PurePath(rel.replace("/", os.sep)).match(glob)
+
+
+@pytest.mark.parametrize(
+    ("glob", "rel", "expected"),
+    [
+        ("**/*.pyc", "a/b.pyc", True),
+        ("**/*.pyc", "b.pyc", False),  # "**" is one component, as in Path.match
+        ("*.pyc", "a/b/c.pyc", True),
+        ("tests/*", "x/tests/a.py", True),
+        ("tests/*", "x/tests/sub/b.py", False),  # "*" never crosses "/"
+        ("src/*", "src/a/b.py", False),
+        ("/src/*", "src/a.py", False),  # absolute patterns never match relative paths
+        ("./*.md", "docs/a.md", True),
+        ("a//b.py", "x/a/b.py", True),
+        ("docs/", "x/docs", True),
+        ("[!a]*.py", "b.py", True),
+        ("[!a]*.py", "a.py", False),
+        ("x[+-0]y", "x/y", False),  # a range spanning "/" still stays in one component
+    ],
+)
+def test_glob_cases(glob: str, rel: str, expected: bool) -> None:
+    assert _path_match(glob, rel) is expected
+    assert _glob_excludes(glob, rel) is expected
+
+
+def test_glob_matches_path_match_on_generated_cases() -> None:
+    rng = random.Random(1234)
+    tokens = ["a", "b", ".", "-", "*", "?", "**", "[ab]", "[!a]", "[a-c]", "[c-a]", "[+-0]", "[]a]", "[", "]", "[!]", "^"]
+    names = ["a", "b", "ab", "ba", ".a", "a.b", "a-b", "c", "[a]", "^", "]"]
+    rels = ["/".join(parts) for depth in (1, 2) for parts in itertools.product(names, repeat=depth)]
+    rels += ["/".join(rng.choices(names, k=3)) for _ in range(100)]
+    for _ in range(2000):
+        glob = "/".join(
+            "".join(rng.choice(tokens) for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(1, 3))
+        )
+        if not PurePath(glob).parts:
+            continue  # Path.match rejects empty patterns; compile_skip_rules ignores them
+        skip = compile_skip_rules((), [glob])
+        for rel in rels:
+            name = rel.rsplit("/", 1)[-1]
+            excluded = _should_skip(name, rel.replace("/", os.sep), False, skip)
+            assert excluded is _path_match(glob, rel), (glob, rel)
+            # Globs never exclude directories, whatever they match.
+            assert not _should_skip(name, rel.replace("/", os.sep), True, skip), (glob, rel)
+
+
+@pytest.mark.parametrize("glob", ["*", "**", "tests/*", "pkg/*", "**/*", "?", "[a-z]*"])
+def test_globs_never_exclude_directories(glob: str) -> None:
+    for rel in ("tests", "x/tests", "x/tests/sub", "pkg", "pkg/sub", "a"):
+        assert not _glob_excludes(glob, rel, is_dir=True), rel
+
+
+def test_excluded_dir_names_match_entry_names() -> None:
+    skip = compile_skip_rules({"build"}, [])
+    assert _should_skip("build", "build", True, skip)
+    assert _should_skip("build", os.path.join("src", "build"), True, skip)
+    assert _should_skip("build", "build", False, skip)
+    assert not _should_skip("build.py", "build.py", False, skip)
+    assert not _should_skip("Build", "Build", True, skip)
+
+
+def _original_walk(root: Path, max_depth: int, exclude_dirs: set[str], globs: list[str]) -> tuple[list[str], list[str]]:
+    # The Path-based walk the scripts used before walk_all: any excluded name in the
+    # relative path skips it; globs are matched with Path.match against files only.
+    def skipped(p: Path) -> bool:
+        rel = p.relative_to(root)
+        if any(part in exclude_dirs for part in rel.parts):
+            return True
+        return not p.is_dir() and any(rel.match(g) for g in globs)
+
+    lines = [str(root)]
+
+    def walk(dir_path: Path, prefix: str, depth: int) -> None:
+        if depth >= max_depth:
+            return
+        entries = sorted((p for p in dir_path.iterdir() if not skipped(p)), key=lambda p: (p.is_file(), p.name.lower()))
+        for i, p in enumerate(entries):
+            last = i == len(entries) - 1
+            lines.append(prefix + ("└── " if last else "├── ") + p.name + ("/" if p.is_dir() else ""))
+            if p.is_dir():
+                walk(p, prefix + ("    " if last else "│   "), depth + 1)
+
+    walk(root, "", 0)
+    py_files = sorted((p for p in root.rglob("*.py") if p.is_file() and not skipped(p)), key=lambda p: str(p).lower())
+    return lines, [str(p.relative_to(root)) for p in py_files]
+
+
+@pytest.mark.parametrize(
+    "globs", [[], ["tests/*"], ["pkg/*"], ["*"], ["**/*.py"], ["*.md", "x/*/*.py"], ["build"]]
+)
+def test_walk_all_excludes_like_the_original_walk(tmp_path: Path, globs: list[str]) -> None:
+    for rel in ("x/tests/a.py", "x/tests/sub/b.py", "x/pkg/sub/c.py", "x/pkg/d.py", "README.md", "build", "y/build/e.py", "top.py"):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("", encoding="utf-8")
+    root = tmp_path.resolve()
+    for max_depth in (1, 2, 6):
+        lines, py_files, _ = walk_all(root, max_depth, compile_skip_rules({"build"}, globs), focus=root)
+        assert (lines, [rel for _, rel in py_files]) == _original_walk(root, max_depth, {"build"}, globs)
+
+
+def _reference_docstring(data: bytes) -> str | None:
+    # What extract_module_docstring returned before the prefix scan: decode like
+    # tokenize.open, parse the whole module, strip surrounding newlines.
+    encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    source = data.decode(encoding).replace("\r\n", "\n").replace("\r", "\n")
+    if source.startswith("\ufeff"):
+        source = source[1:]
+    doc = ast.get_docstring(ast.parse(source), clean=False)
+    if doc is None:
+        return None
+    doc = doc.strip("\n")
+    return doc if doc.strip() else None
+
+
+DOCSTRING_SOURCES = [
+    b'"""Package init."""\n',
+    b"#!/usr/bin/env python3\n# -*- coding: utf-8 -*-\n# comment\n\n\'\'\'\nMulti-line\ndoc.\n\'\'\'\nimport os\n",
+    b'# -*- coding: latin-1 -*-\n"""Caf\xe9 latin"""\n',
+    b'\xef\xbb\xbf"""bom doc"""\n',
+    b'#c\r\n"""crlf\r\ndoc"""\r\n',
+    b'#c\r"""cr only"""\r',
+    b'import os\nx = "not a doc"\n',
+    b'r"""Raw \\d doc"""\n',
+    b'u"""unicode prefix"""\n',
+    b'"a" "b"\n',
+    b'f"""not doc"""\n',
+    b'b"""bytes"""\n',
+    b"",
+    b"# only a comment\n",
+    b'"""   \n\n"""\n',
+    b'("""paren doc""")\n',
+    b'"""semi""" ; import os\n',
+    b'"""cont""" \\\n + "x"\n',
+    b'\n\n"""\n\nafter blank\n\n"""\n',
+    b'"""doc""".strip()\n',
+    b'"""tab\\there \\N{BULLET} \\\njoined"""\n',
+    b"\'single quoted doc\'\n",
+    b'"""doc""" # trailing comment\n',
+    b'"""doc"""',
+    b'"""' + b"x" * 20000 + b'"""\n',
+    b'"""' + "\u00e9".encode() * 5000 + b'"""\n',
+]
+
+
+@pytest.mark.parametrize("data", DOCSTRING_SOURCES)
+def test_docstring_prefix_scan_agrees_with_ast(data: bytes) -> None:
+    expected = _reference_docstring(data)
+    decided, doc = _docstring_from_prefix(data, True)
+    if decided:
+        assert doc == expected
+    # A window cut anywhere, even mid-character, must either defer or agree.
+    for cut in range(0, min(len(data), 300)):
+        decided, doc = _docstring_from_prefix(data[:cut], False)
+        if decided:
+            assert doc == expected, cut
+
+
+def test_docstring_prefix_scan_decides_common_cases() -> None:
+    for data in (b'"""Package init."""\n', b"# c\n\n\'\'\'\nDoc\n\'\'\'\nimport os\n", b"import os\n"):
+        decided, _ = _docstring_from_prefix(data, True)
+        assert decided
+
+
+def test_docstring_prefix_scan_on_generated_sources() -> None:
+    rng = random.Random(4321)
+    heads = ["", "# c\n", "\n", "#!/usr/bin/env python\n", "# -*- coding: latin-1 -*-\n", "  \n", "\t# c\n"]
+    literals = [
+        '"""doc"""', "'''doc'''", '"d"', "'d'", 'r"\\d"', 'u"x"', 'b"x"', 'f"x"', '""""""',
+        '"""a\nb"""', '"""a\\"""b"""', '"a\\"b"', '"""\n\n"""', '("x")', "x = 1", "@d\ndef f(): pass",
+    ]
+    tails = ["", "\n", " # c\n", ";x = 1\n", ".strip()\n", ' "y"\n', " \\\n+ 'z'\n", "\nimport os\n", "\r\n"]
+    for _ in range(3000):
+        source = rng.choice(heads) + rng.choice(heads) + rng.choice(literals) + rng.choice(tails)
+        data = source.encode("latin-1" if "latin-1" in source else "utf-8")
+        try:
+            expected = _reference_docstring(data)
+        except SyntaxError:
+            continue
+        decided, doc = _docstring_from_prefix(data, True)
+        if decided:
+            assert doc == expected, source
+
+
+@pytest.mark.parametrize("data", DOCSTRING_SOURCES)
+def test_extract_module_docstring_matches_full_parse(tmp_path: Path, data: bytes) -> None:
+    path = tmp_path / "mod.py"
+    path.write_bytes(data)
+    assert extract_module_docstring(path) == _reference_docstring(data)
+
+
+def test_extract_module_docstring_falls_back_on_syntax_errors(tmp_path: Path) -> None:
+    path = tmp_path / "broken.py"
+    path.write_text('"""Broken file doc."""\ndef f(:\n', encoding="utf-8")
+    assert extract_module_docstring(path) == "Broken file doc."
+    path.write_text('import x\n"""not doc"""\ndef f(:\n', encoding="utf-8")
+    assert extract_module_docstring(path) is None
+
+
+def test_walk_all_lists_symlinked_dirs_without_following(tmp_path: Path) -> None:
+    (tmp_path / "real").mkdir()
+    (tmp_path / "real" / "a.py").write_text('"""a"""\n', encoding="utf-8")
+    (tmp_path / "z.py").write_text("", encoding="utf-8")
+    try:
+        os.symlink(tmp_path / "real", tmp_path / "link", target_is_directory=True)
+        os.symlink(tmp_path / "nowhere", tmp_path / "dangling")
+    except OSError:
+        pytest.skip("symlinks not supported here")
+
+    root = tmp_path.resolve()
+    lines, py_files, _ = walk_all(root, 3, compile_skip_rules((), ()), focus=root)
+    # Not a regular file, so the dangling link sorts with the directories, as it always did.
+    assert lines[1:] == [
+        "├── dangling",
+        "├── link/",
+        "├── real/",
+        "│   └── a.py",
+        "└── z.py",
+    ]
+    assert [rel for _, rel in py_files] == [os.path.join("real", "a.py"), "z.py"]
+
+
+def test_walk_all_survives_looping_and_broken_symlinks(tmp_path: Path) -> None:
+    (tmp_path / "f").write_text("", encoding="utf-8")
+    (tmp_path / "a.py").write_text("", encoding="utf-8")
+    (tmp_path / "notes.md").write_text("# n\n", encoding="utf-8")
+    try:
+        os.symlink("loop", tmp_path / "loop")  # ELOOP
+        os.symlink(os.path.join("f", "x"), tmp_path / "bad")  # ENOTDIR
+        os.symlink("loop", tmp_path / "loop.py")
+        os.symlink(os.path.join("f", "x.md"), tmp_path / "bad.md")
+    except OSError:
+        pytest.skip("symlinks not supported here")
+
+    root = tmp_path.resolve()
+    lines, py_files, md_files = walk_all(root, 3, compile_skip_rules((), ()), focus=root, collect_md=True)
+    assert (lines, [rel for _, rel in py_files]) == _original_walk(root, 3, set(), [])
+    assert [rel for _, rel in md_files] == ["notes.md"]
+
+
+def test_is_within_str() -> None:
+    root = os.path.join(os.sep, "tmp", "fx")
+    assert is_within_str(root, root)
+    assert is_within_str(os.path.join(root, "src"), root)
+    assert not is_within_str(root + "y", root)  # sibling sharing the prefix
+    assert not is_within_str(os.path.dirname(root), root)
+    assert is_within_str(root, os.sep)
+
+
+def _original_truncate_block(text: str, max_lines: int, max_chars: int) -> str:
+    lines = text.splitlines()
+    if len(lines) > max_lines:
+        lines = lines[:max_lines] + ["… (truncated)"]
+    out = "\n".join(lines)
+    if len(out) > max_chars:
+        out = out[: max_chars - 20].rstrip() + "\n… (truncated)"
+    return out
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "\n", "a", "a\n", "a\n\n", "a\nb", "a\r\nb", "a\rb\n", "a\x0cb", "a\u2028b", "x" * 50, "\n".join("abc" * 5 for _ in range(9))],
+)
+@pytest.mark.parametrize("max_lines", [-1, 0, 1, 2, 8, 60])
+@pytest.mark.parametrize("max_chars", [0, 5, 30, 4000])
+def test_truncate_block_matches_original(text: str, max_lines: int, max_chars: int) -> None:
+    assert truncate_block(text, max_lines, max_chars) == _original_truncate_block(text, max_lines, max_chars)
+
+
+def test_truncate_block_matches_original_on_generated_text() -> None:
+    rng = random.Random(99)
+    alphabet = ["a", "b", " ", "\n", "\n", "\n", "\r", "\r\n", "\x0c", "\x1e", "\x85", "\u2029", "xyz"]
+    for _ in range(20000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        max_lines, max_chars = rng.randint(-2, 12), rng.randint(0, 60)
+        expected = _original_truncate_block(text, max_lines, max_chars)
+        assert truncate_block(text, max_lines, max_chars) == expected, (text, max_lines, max_chars)
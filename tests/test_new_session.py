@@ -0,0 +1,94 @@
+"""
+Purpose:
+
+- Unit tests for the session index scan and its .index cache in new_session.py.
+
+Notes:
+
+- The script lives in a hyphenated skill folder, so it is loaded by file path.
+- The cache is keyed on the sessions directory mtime; on filesystems with coarse
+  timestamps the tests nudge the mtime forward so each change is observable.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[1] / "fr" / "skills" / "session-journal" / "scripts" / "new_session.py"
+
+_spec = importlib.util.spec_from_file_location("new_session", SCRIPT)
+assert _spec is not None and _spec.loader is not None
+new_session = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(new_session)
+
+
+def _run(monkeypatch: pytest.MonkeyPatch, sessions_dir: Path, *args: str) -> Path:
+    before = {p.name for p in sessions_dir.iterdir()} if sessions_dir.exists() else set()
+    monkeypatch.setattr(sys, "argv", ["new_session.py", "--dir", str(sessions_dir), *args])
+    new_session.main()
+    (created,) = {p.name for p in sessions_dir.iterdir()} - before - {new_session.INDEX_CACHE_NAME}
+    return sessions_dir / created
+
+
+def _add_file(sessions_dir: Path, name: str) -> None:
+    # Create a file behind the script's back, making sure the directory mtime moves.
+    before = sessions_dir.stat().st_mtime_ns
+    (sessions_dir / name).write_text("", encoding="utf-8")
+    st = sessions_dir.stat()
+    if st.st_mtime_ns == before:
+        os.utime(sessions_dir, ns=(st.st_atime_ns, before + 1_000_000_000))
+
+
+def _forbid_scan(monkeypatch: pytest.MonkeyPatch) -> None:
+    def scandir(path: object) -> None:
+        raise AssertionError("sessions dir was rescanned")
+
+    monkeypatch.setattr(new_session.os, "scandir", scandir)
+
+
+def test_cold_scan_returns_max_plus_one(tmp_path: Path) -> None:
+    for name in ("0003-2026-01-01--a.md", "0012-2026-01-02--b.md", "notes.md", "0099-x.txt", "12-x.md"):
+        (tmp_path / name).write_text("", encoding="utf-8")
+    assert new_session.next_index(tmp_path) == 13
+
+
+def test_cache_is_hit_while_dir_is_unchanged(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    sessions_dir = tmp_path / "sessions"
+    assert _run(monkeypatch, sessions_dir, "first").name.startswith("0001-")
+    # The first run creates .index, which bumps the dir mtime; the cache is only valid if
+    # the file was created before that mtime was recorded.
+    with monkeypatch.context() as m:
+        _forbid_scan(m)
+        assert new_session.next_index(sessions_dir) == 2
+    assert _run(monkeypatch, sessions_dir, "second").name.startswith("0002-")
+    _forbid_scan(monkeypatch)
+    assert new_session.next_index(sessions_dir) == 3
+
+
+def test_external_file_invalidates_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    sessions_dir = tmp_path / "sessions"
+    _run(monkeypatch, sessions_dir, "first")
+    _add_file(sessions_dir, "0042-2026-01-01--manual.md")
+    assert new_session.next_index(sessions_dir) == 43
+    assert _run(monkeypatch, sessions_dir, "next").name.startswith("0043-")
+
+
+@pytest.mark.parametrize("garbage", ["", "garbage", "1 2 3", "x 7", "\x00\xff"])
+def test_garbage_cache_falls_back_to_scan(tmp_path: Path, garbage: str) -> None:
+    (tmp_path / "0005-2026-01-01--a.md").write_text("", encoding="utf-8")
+    (tmp_path / new_session.INDEX_CACHE_NAME).write_text(garbage, encoding="utf-8")
+    assert new_session.next_index(tmp_path) == 6
+
+
+def test_no_index_runs_do_not_disturb_the_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    sessions_dir = tmp_path / "sessions"
+    _run(monkeypatch, sessions_dir, "first")
+    dated = _run(monkeypatch, sessions_dir, "--no-index", "dated")
+    assert not dated.name[:4].startswith("0")
+    assert new_session.next_index(sessions_dir) == 2
+    assert _run(monkeypatch, sessions_dir, "second").name.startswith("0002-")